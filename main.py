@@ -1,14 +1,19 @@
+import os
 import sys
 import re
+import hashlib
+from itertools import groupby
+from operator import attrgetter
 import numpy as np
 import openpyxl
 from PyQt5 import QtWidgets
 import pyqtgraph as pg
 from PyQt5.QtGui import QIcon
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Side, Border, Font, Alignment
+from openpyxl.utils import get_column_letter
 
 from constants import DataTableColumns, ParamTableColumns, PLOT_COLORS
-from errors import ListsNotSameLength
 from store import Store, InitialDataItem, InitialDataItemList
 from utils import (
     linear,
@@ -16,28 +21,56 @@ from utils import (
     calculate_rns,
     calculate_rns_per_sample,
     calculate_drift_per_sample,
-    calculate_rn_sqrt,
-    drop_nans,
     calculate_square,
+    calculate_rn_sqrt,
     calculate_drift,
+    calculate_rms_error,
+    format_value,
+    valid_samples,
+    extend_to_drift,
+    to_float_array,
+    finite_mean,
 )
 from widgets.cell import CellWidget
-from widgets.tables.item import TableWidgetItem
 from widgets.tables.data_table import DataTable
 from widgets.tables.param_table import ParamTable
 
+# Стили листа ячеек неизменяемы и одинаковы для всех сохранений, создаются один раз при импорте
+_THICK = Side(style="thick")
+_ALIGN = Alignment(horizontal="center", vertical="center")
+_BORDER_NAME = Border(right=_THICK, left=_THICK, top=_THICK, bottom=_THICK)
+_BORDER_RNS = Border(right=_THICK, left=_THICK, bottom=_THICK)
+_BORDER_MID = Border(right=_THICK, left=_THICK)
+_FONT_BOLD = Font(bold=True)
+
+# Имена листов сохраненного файла: "Data №<ячейка> <имя>" и "Results №<ячейка> <имя>"
+_DATA_SHEET_RE = re.compile(r"^Data №(\d+) (.*)$")
+_RESULTS_SHEET_RE = re.compile(r"^Results №(\d+) .*$")
+# Заголовки листов данных и результатов не меняются, собираются один раз при импорте
+_DATA_HEADERS = tuple(DataTableColumns.get_all_names())
+_RESULTS_HEADERS = tuple(ParamTableColumns.get_all_names())
+
 
 class Window(QtWidgets.QWidget):
+    # Иконка читается с диска один раз (после создания QApplication) и переиспользуется новыми окнами
+    _window_icon = None
+
     def __init__(self):
         super(Window, self).__init__()
 
-        self.setWindowIcon(QIcon("./assets/rns-logo-sm.png"))
+        if Window._window_icon is None:
+            Window._window_icon = QIcon("./assets/rns-logo-sm.png")
+        self.setWindowIcon(Window._window_icon)
         # Таблица с исходными данными
         self.data_table_label = QtWidgets.QLabel("Таблица с данными", self)
         self.data_table = DataTable(rows=50)
+        self._last_calc_key = None  # Ключ состояния таблицы после последнего расчета, сбрасывается при очистке
+        self._last_dir = ""  # Папка последнего сохраненного или открытого файла
 
         # График
         self.plot = pg.PlotWidget()
+        self._current_curves = {}  # Построенные точки и прямая текущих данных
+        self._items_by_cell = {}  # Построенные графики записанных ячеек по номеру ячейки
         self.prepare_plot()
 
         # Main Layout
@@ -129,209 +162,206 @@ class Window(QtWidgets.QWidget):
         self.setLayout(self.layout)
 
     def calculate_means(self):
-        rns_list = []
-        drift_list = []
-        for cell in self.cell_widgets:
-            _, drift, rns = self.parse_cell(cell)
-            if drift:
-                drift_list.append(drift)
-            if rns:
-                rns_list.append(rns)
-
-        self.mean_drift.setText(f"Средний уход: {round(np.mean(drift_list), 3)}")
-        self.mean_rns.setText(f"Средний RnS: {round(np.mean(rns_list), 1)}")
-
-    def calculate_rn05(self):
+        # Средние считаются по записанным значениям ячеек из Store, без разбора текста виджетов.
+        # Значений не больше 16, поэтому среднее считается без массивов NumPy
+        drift_mean = finite_mean(item.drift for item in Store.data)
+        rns_mean = finite_mean(item.rns for item in Store.data)
+        self.mean_drift.setText(f"Средний уход: {drift_mean:.3f}")
+        self.mean_rns.setText(f"Средний RnS: {rns_mean:.1f}")
+
+    def calculate_rn05(self, snapshot):
         """Расчет Rn^-0.5 для каждого образца"""
-        for row in range(self.data_table.rowCount()):
-            resistance = self.data_table.get_column_value(row, DataTableColumns.RESISTANCE)
-            diameter = self.data_table.get_column_value(row, DataTableColumns.DIAMETER)
-            if not resistance or not diameter:
-                continue
-            rn_sqrt = calculate_rn_sqrt(resistance)
-            self.data_table.setItem(row, DataTableColumns.RN_SQRT.index, TableWidgetItem(str(rn_sqrt)))
-
-    def calculate_main_params(self):
+        resistance_arr = snapshot[DataTableColumns.RESISTANCE.index]
+        diameter_arr = snapshot[DataTableColumns.DIAMETER.index]
+        rn_sqrt_arr = np.full_like(resistance_arr, np.nan)
+        mask = valid_samples(resistance_arr, diameter_arr)
+        rn_sqrt_arr[mask] = calculate_rn_sqrt(resistance_arr[mask])
+        self.data_table.set_column_if_changed(DataTableColumns.RN_SQRT, rn_sqrt_arr)
+        snapshot[DataTableColumns.RN_SQRT.index] = rn_sqrt_arr
+
+    def calculate_main_params(self, snapshot):
         """Расчет Наклона, Пересечения, RnS, Ухода в целом"""
-        diameter_list = self.data_table.get_column_values(DataTableColumns.DIAMETER)
-        rn_sqrt_list = self.data_table.get_column_values(DataTableColumns.RN_SQRT)
-        try:
-            diameter_list, rn_sqrt_list = drop_nans(diameter_list, rn_sqrt_list)
-        except ListsNotSameLength:
-            return
-        slope, intercept = linear_fit(diameter_list, rn_sqrt_list)
+        diameter_arr = snapshot[DataTableColumns.DIAMETER.index]
+        rn_sqrt_arr = snapshot[DataTableColumns.RN_SQRT.index]
+        mask = np.isfinite(diameter_arr) & np.isfinite(rn_sqrt_arr)
+        slope, intercept = linear_fit(diameter_arr[mask], rn_sqrt_arr[mask])
 
-        self.param_table.setItem(
-            0,
-            ParamTableColumns.SLOPE.index,
-            TableWidgetItem(str(slope)),
-        )
-        self.param_table.setItem(
-            0,
-            ParamTableColumns.INTERCEPT.index,
-            TableWidgetItem(str(intercept)),
-        )
+        self.param_table.set_if_changed(0, ParamTableColumns.SLOPE.index, format_value(slope))
+        self.param_table.set_if_changed(0, ParamTableColumns.INTERCEPT.index, format_value(intercept))
 
         drift = calculate_drift(slope=slope, intercept=intercept)
-
-        self.param_table.setItem(
-            0,
-            ParamTableColumns.DRIFT.index,
-            TableWidgetItem(str(drift)),
-        )
+        self.param_table.set_if_changed(0, ParamTableColumns.DRIFT.index, format_value(drift))
 
         rns = calculate_rns(slope)
-        self.param_table.setItem(
-            0,
-            ParamTableColumns.RNS.index,
-            TableWidgetItem(str(rns)),
-        )
+        self.param_table.set_if_changed(0, ParamTableColumns.RNS.index, format_value(rns))
+        return slope, intercept, drift, rns
 
-    def calculate_error_params(self):
+    def calculate_error_params(self, snapshot, drift: float, rns: float):
         """Расчет ошибок RnS и Ухода"""
-        rns = self.param_table.get_column_value(0, ParamTableColumns.RNS)
-        rns_list = np.array([v for v in self.data_table.get_column_values(DataTableColumns.RNS) if v], dtype=float)
-        rns_error = np.sqrt(np.sum((rns_list - rns) ** 2) / len(rns_list))
-        self.param_table.setItem(
-            0,
-            ParamTableColumns.RNS_ERROR.index,
-            TableWidgetItem(str(rns_error)),
-        )
+        rns_error = calculate_rms_error(snapshot[DataTableColumns.RNS.index], rns)
+        self.param_table.set_if_changed(0, ParamTableColumns.RNS_ERROR.index, format_value(rns_error))
 
-        drift = self.param_table.get_column_value(0, ParamTableColumns.DRIFT)
-        drift_list = np.array([v for v in self.data_table.get_column_values(DataTableColumns.DRIFT) if v], dtype=float)
-        drift_error = np.sqrt(np.sum((drift_list - drift) ** 2) / len(drift_list))
-        self.param_table.setItem(
-            0,
-            ParamTableColumns.DRIFT_ERROR.index,
-            TableWidgetItem(str(drift_error)),
-        )
+        drift_error = calculate_rms_error(snapshot[DataTableColumns.DRIFT.index], drift)
+        self.param_table.set_if_changed(0, ParamTableColumns.DRIFT_ERROR.index, format_value(drift_error))
 
-    def calculate_rns_drift_square_per_sample(self):
+    def calculate_rns_drift_square_per_sample(self, snapshot, drift: float, rns_mean: float):
         """Расчет RnS, Ухода и Площади для каждого образца по отдельности"""
-        drift = self.param_table.get_column_value(0, ParamTableColumns.DRIFT)
-        if not drift:
-            return
-
-        rns_mean = self.param_table.get_column_value(0, ParamTableColumns.RNS)
-        if not rns_mean:
-            return
-
-        for row in range(self.data_table.rowCount()):
-            diameter = self.data_table.get_column_value(row, DataTableColumns.DIAMETER)
-            resistance = self.data_table.get_column_value(row, DataTableColumns.RESISTANCE)
-            if not resistance or not diameter:
-                continue
+        resistance_arr = snapshot[DataTableColumns.RESISTANCE.index]
+        diameter_arr = snapshot[DataTableColumns.DIAMETER.index]
+        square_arr = np.full_like(resistance_arr, np.nan)
+        rns_arr = np.full_like(resistance_arr, np.nan)
+        drift_arr = np.full_like(resistance_arr, np.nan)
+
+        if drift and rns_mean:
+            rows = np.flatnonzero(valid_samples(resistance_arr, diameter_arr))
+            resistance, diameter = resistance_arr[rows], diameter_arr[rows]
+            # Площадь и RnS считаются с общим уходом, уход образца - с общим RnS
+            square_arr[rows] = calculate_square(diameter=diameter, drift=drift)
+            rns_arr[rows] = calculate_rns_per_sample(resistance=resistance, diameter=diameter, drift=drift)
+            drift_arr[rows] = calculate_drift_per_sample(diameter=diameter, resistance=resistance, rns=rns_mean)
+
+        # Столбцы пишутся целиком: строки без расчета очищаются, неизмененные значения не трогаются
+        for column, values in (
+            (DataTableColumns.SQUARE, square_arr),
+            (DataTableColumns.RNS, rns_arr),
+            (DataTableColumns.DRIFT, drift_arr),
+        ):
+            self.data_table.set_column_if_changed(column, values)
+            snapshot[column.index] = values
 
-            square_value = calculate_square(diameter=diameter, drift=drift)  # подставлям общий уход
-            self.data_table.setItem(row, DataTableColumns.SQUARE.index, TableWidgetItem(str(square_value)))
-
-            rns_value = calculate_rns_per_sample(resistance=resistance, diameter=diameter, drift=drift)
-            self.data_table.setItem(
-                row,
-                DataTableColumns.RNS.index,
-                TableWidgetItem(str(rns_value)),
-            )
-
-            drift_value = calculate_drift_per_sample(diameter=diameter, resistance=resistance, rns=rns_mean)
-            self.data_table.setItem(row, DataTableColumns.DRIFT.index, TableWidgetItem(str(drift_value)))
+    @staticmethod
+    def snapshot_key(snapshot) -> bytes:
+        return hashlib.blake2b(b"".join(values.tobytes() for values in snapshot.values()), digest_size=16).digest()
 
     def calculate_results(self):
-        self.data_table.clear_calculations()
-        self.calculate_rn05()
-        self.calculate_main_params()
-        self.calculate_rns_drift_square_per_sample()
-        self.calculate_error_params()
-        self.plot_current_data()
-
-    def plot_current_data(self):
-        diameter_list = self.data_table.get_column_values(DataTableColumns.DIAMETER)
-        rn_sqrt_list = self.data_table.get_column_values(DataTableColumns.RN_SQRT)
-        try:
-            diameter_list, rn_sqrt_list = drop_nans(diameter_list, rn_sqrt_list)
-            diameter_list, rn_sqrt_list = np.array(
-                sorted(np.array([diameter_list, rn_sqrt_list]).T, key=lambda x: x[0]), dtype=float
-            ).T
-            diameter_list = diameter_list.tolist()
-            rn_sqrt_list = rn_sqrt_list.tolist()
-        except ListsNotSameLength:
+        # Столбцы таблицы читаются один раз, дальше расчет идет по снимку
+        snapshot = self.data_table.snapshot_numeric()
+        # Таблица в том же состоянии, в котором ее оставил прошлый расчет - пересчитывать нечего
+        if self.snapshot_key(snapshot) == self._last_calc_key:
             return
-        drift = self.param_table.get_column_value(0, ParamTableColumns.DRIFT)
-        slope = self.param_table.get_column_value(0, ParamTableColumns.SLOPE)
-        intercept = self.param_table.get_column_value(0, ParamTableColumns.INTERCEPT)
 
-        plotItem = self.plot.getPlotItem()
-        items_data = [item for item in plotItem.items if item.name() == "Data"]
-
-        items_fit = [item for item in plotItem.items if item.name() == "Fit"]
-
-        if items_data:
-            items_data[0].setData(diameter_list, rn_sqrt_list)
-        else:
-            self.plot.plot(diameter_list, rn_sqrt_list, name="Data", symbolSize=6, symbolBrush="#000000")
-
-        if np.min(diameter_list) > drift:
-            diameter_list.insert(0, drift)
-        if np.max(diameter_list) < drift:
-            diameter_list.append(drift)
-        y_appr = np.vectorize(lambda x: linear(x, slope, intercept))(diameter_list)
-
-        if items_fit:
-            items_fit[0].setData(diameter_list, y_appr)
-
-        else:
-            pen2 = pg.mkPen(color="#000000", width=3)
-            self.plot.plot(
-                diameter_list,
-                y_appr,
-                name="Fit",
-                pen=pen2,
-                symbolSize=0,
-                symbolBrush=pen2.color(),
-            )
+        # Расчетные столбцы не очищаются заранее: каждый шаг перезаписывает свой столбец целиком.
+        # Общие уход и RnS передаются дальше напрямую, без обратного чтения из таблицы параметров
+        with self.data_table.bulk_update(), self.param_table.bulk_update():
+            self.calculate_rn05(snapshot)
+            slope, intercept, drift, rns = self.calculate_main_params(snapshot)
+            self.calculate_rns_drift_square_per_sample(snapshot, drift, rns)
+            self.calculate_error_params(snapshot, drift, rns)
+        self.plot_current_data(snapshot, drift=drift, slope=slope, intercept=intercept)
+        # Ключ берется по снимку после расчета: вставка поверх расчетных столбцов его меняет и вызывает пересчет
+        self._last_calc_key = self.snapshot_key(snapshot)
+
+    def plot_current_data(self, snapshot=None, drift=None, slope=None, intercept=None):
+        # После расчета данные и параметры передаются напрямую, иначе читаются из таблиц
+        if snapshot is None:
+            snapshot = self.data_table.snapshot_numeric()
+        if drift is None:
+            drift = self.param_table.get_column_value(0, ParamTableColumns.DRIFT)
+            slope = self.param_table.get_column_value(0, ParamTableColumns.SLOPE)
+            intercept = self.param_table.get_column_value(0, ParamTableColumns.INTERCEPT)
+        self._plot_series(
+            self._current_curves,
+            snapshot[DataTableColumns.DIAMETER.index],
+            snapshot[DataTableColumns.RN_SQRT.index],
+            drift=drift,
+            slope=slope,
+            intercept=intercept,
+            color="#000000",
+            data_name="Data",
+            fit_name="Fit",
+        )
 
     def addCellData(self, cell: int, name: str):
+        # Диаметры и Rn^-0.5 берутся из одного снимка таблицы, пустые значения - NaN
+        snapshot = self.data_table.snapshot_numeric()
+        params = self.param_table.get_row(0)
         Store.update_or_create_item(
             cell=cell,
             name=name,
-            diameter_list=self.data_table.get_column_values(DataTableColumns.DIAMETER),
-            rn_sqrt_list=self.data_table.get_column_values(DataTableColumns.RN_SQRT),
-            slope=self.param_table.get_column_value(0, ParamTableColumns.SLOPE),
-            intercept=self.param_table.get_column_value(0, ParamTableColumns.INTERCEPT),
-            drift=self.param_table.get_column_value(0, ParamTableColumns.DRIFT),
-            rns=self.param_table.get_column_value(0, ParamTableColumns.RNS),
-            drift_error=self.param_table.get_column_value(0, ParamTableColumns.DRIFT_ERROR),
-            rns_error=self.param_table.get_column_value(0, ParamTableColumns.RNS_ERROR),
+            diameter=snapshot[DataTableColumns.DIAMETER.index],
+            rn_sqrt=snapshot[DataTableColumns.RN_SQRT.index],
+            slope=params[ParamTableColumns.SLOPE],
+            intercept=params[ParamTableColumns.INTERCEPT],
+            drift=params[ParamTableColumns.DRIFT],
+            rns=params[ParamTableColumns.RNS],
+            drift_error=params[ParamTableColumns.DRIFT_ERROR],
+            rns_error=params[ParamTableColumns.RNS_ERROR],
             initial_data=self.data_table.dump_data(),
         )
 
     def plot_data(self, cell: int):
-        color = PLOT_COLORS[cell - 1]
-        item = Store.data.get(cell=cell)
+        item = Store.get_item(cell)
         if not item:
             return
-        diameter, rn_sqrt = drop_nans(item.diameter, item.rn_sqrt)
-        diameter_list = diameter.tolist()
-        if np.min(diameter_list) > item.drift:
-            diameter_list.insert(0, item.drift)
-        if np.max(diameter_list) < item.drift:
-            diameter_list.append(item.drift)
-        y_appr = np.vectorize(lambda x: linear(x, item.slope, item.intercept))(diameter_list)
-        pen2 = pg.mkPen(color=color, width=2)
-        self.plot.plot(
-            diameter_list,
-            y_appr,
-            name=f"{item.name}",
-            pen=pen2,
+        # Пустые значения (NaN) отбрасывает сам _plot_series
+        self._plot_series(
+            self._items_by_cell.setdefault(cell, {}),
+            item.diameter,
+            item.rn_sqrt,
+            drift=item.drift,
+            slope=item.slope,
+            intercept=item.intercept,
+            color=PLOT_COLORS[cell - 1],
+            fit_name=f"{item.name}",
+            pen_width=2,
+        )
+
+    def _plot_series(
+        self,
+        curves,
+        diameter_arr,
+        rn_sqrt_arr,
+        drift,
+        slope,
+        intercept,
+        *,
+        color,
+        fit_name,
+        data_name=None,
+        symbol_size=6,
+        pen_width=3,
+    ):
+        """Построение прямой аппроксимации и, если задано имя, точек данных.
+        Уже построенные элементы серии берутся из curves и обновляются, новые туда добавляются"""
+        mask = np.isfinite(diameter_arr) & np.isfinite(rn_sqrt_arr)
+        diameter_arr, rn_sqrt_arr = diameter_arr[mask], rn_sqrt_arr[mask]
+        if not diameter_arr.size:
+            # Строить нечего: уже построенные элементы серии очищаются
+            for item in curves.values():
+                item.setData([], [])
+            return
+        order = np.argsort(diameter_arr, kind="stable")
+        diameter_arr, rn_sqrt_arr = diameter_arr[order], rn_sqrt_arr[order]
+        x_fit = extend_to_drift(diameter_arr, drift)
+        y_fit = linear(x_fit, slope, intercept)
+
+        if data_name is not None:
+            item_data = curves.get("data")
+            if item_data is not None:
+                item_data.setData(diameter_arr, rn_sqrt_arr)
+            else:
+                curves["data"] = self.plot.plot(
+                    diameter_arr, rn_sqrt_arr, name=data_name, symbolSize=symbol_size, symbolBrush=color
+                )
+
+        item_fit = curves.get("fit")
+        if item_fit is not None:
+            item_fit.setData(x_fit, y_fit)
+            return
+
+        pen = pg.mkPen(color=color, width=pen_width)
+        curves["fit"] = self.plot.plot(
+            x_fit,
+            y_fit,
+            name=fit_name,
+            pen=pen,
             symbolSize=0,
-            symbolBrush=pen2.color(),
+            symbolBrush=pen.color(),
         )
 
     def remove_plot(self, cell: int):
-        cell_data = Store.data.get(cell=cell)
         plotItem = self.plot.getPlotItem()
-        items_to_remove = [item for item in plotItem.items if item.name() == cell_data.name]
-        for item in items_to_remove:
+        for item in self._items_by_cell.pop(cell, {}).values():
             plotItem.removeItem(item)
 
     def prepare_plot(self):
@@ -345,96 +375,91 @@ class Window(QtWidgets.QWidget):
         self.plot.showGrid(x=True, y=True)
 
     def clean_rn(self):
+        self._last_calc_key = None
         self.data_table.clear_rn()
         self.param_table.clear_all()
 
     def clean_all(self):
+        self._last_calc_key = None
         self.data_table.clear_all()
         self.param_table.clear_all()
         self.plot.clear()
+        self._current_curves.clear()
+        self._items_by_cell.clear()
 
     @staticmethod
     def parse_cell(cell):
-        drift = float(cell.drift.text()) if cell.drift.text() else ""
-        rns = float(cell.rns.text()) if cell.rns.text() else ""
-        return [cell.name.text(), drift, rns]
+        drift_text = cell.drift.text()
+        rns_text = cell.rns.text()
+        drift = float(drift_text) if drift_text else ""
+        rns = float(rns_text) if rns_text else ""
+        return cell.name.text(), drift, rns
 
     def save_cell_data(self):
-        options = QtWidgets.QFileDialog.Options()
-        options |= QtWidgets.QFileDialog.DontUseNativeDialog
+        # Системный диалог открывается быстрее встроенного в Qt, папка запоминается между вызовами
         file_name, _ = QtWidgets.QFileDialog.getSaveFileName(
             self,
             "Save Cell Data",
-            "",
+            self._last_dir,
             "Excel Files (*.xlsx);;All Files (*)",
-            options=options,
         )
         if not file_name:
             return
+        self._last_dir = os.path.dirname(file_name)
 
-        wb = openpyxl.Workbook()
-        ws_cells = wb.active
-        ws_cells.title = "Cells data"
+        # Книга пишется потоком: строки сразу сериализуются, без хранения всей сетки клеток в памяти
+        wb = openpyxl.Workbook(write_only=True)
+        ws_cells = wb.create_sheet("Cells data")
 
         init_data = [self.parse_cell(cell) for cell in self.cell_widgets]
-        output = []
 
-        # Разделение исходного массива на блоки по 4 строки
-        blocks = [init_data[i : i + 4] for i in range(0, len(init_data), 4)]
+        # Ячейки идут рядами по 4, каждый ряд записывается блоком из 3 строк: имена, уходы, RnS
+        output = np.asarray(init_data, dtype=object).reshape(-1, 4, 3).transpose(0, 2, 1).reshape(-1, 4).tolist()
+
+        # В потоковом режиме размеры задаются до записи строк
+        # Устанавливаем ширину всех столбцов
+        for col_ind in range(1, len(output[0]) + 1):
+            ws_cells.column_dimensions[get_column_letter(col_ind)].width = 12
+
+        # Устанавливаем высоту для всех строк
+        for row_ind in range(1, len(output) + 1):
+            ws_cells.row_dimensions[row_ind].height = 21
 
-        # Обработка каждого блока
-        for block in blocks:
-            # Перестановка элементов в блоке
-            block_transposed = list(map(list, zip(*block)))
-            # Добавление переставленного блока в выходной массив
-            output.extend(block_transposed)
         for row_ind, row in enumerate(output, 1):
-            for col_ind, coll in enumerate(row, 1):
-                cell = ws_cells.cell(row=row_ind, column=col_ind, value=coll)
-                cell.alignment = Alignment(horizontal="center", vertical="center")
+            cells = []
+            for coll in row:
+                cell = WriteOnlyCell(ws_cells, value=coll)
+                cell.alignment = _ALIGN
                 if (row_ind - 1) % 3 == 0:  # для клеток с названием серии
-                    cell.border = Border(
-                        right=Side(style="thick"),
-                        left=Side(style="thick"),
-                        top=Side("thick"),
-                        bottom=Side(style="thick"),
-                    )
-                    cell.font = Font(bold=True)
+                    cell.border = _BORDER_NAME
+                    cell.font = _FONT_BOLD
                 elif (row_ind - 3) % 3 == 0:  # для клеток с названием rns
-                    cell.border = Border(
-                        right=Side(style="thick"), left=Side(style="thick"), bottom=Side(style="thick")
-                    )
+                    cell.border = _BORDER_RNS
                 else:  # для остальных клеток
-                    cell.border = Border(right=Side(style="thick"), left=Side(style="thick"))
-
-        # Устанавливаем ширину всех столбцов
-        for col in ws_cells.columns:
-            column = col[0].column_letter  # Получаем букву столбца
-            ws_cells.column_dimensions[column].width = 12
-
-        # Устанавливаем высоту для всех строк
-        for row in ws_cells.rows:
-            ws_cells.row_dimensions[row[0].row].height = 21
+                    cell.border = _BORDER_MID
+                cells.append(cell)
+            ws_cells.append(cells)
 
         # Сохраняем все данные
-        data_headers = [self.data_table.horizontalHeaderItem(i).text() for i in range(self.data_table.columnCount())]
-        results_headers = [
-            self.param_table.horizontalHeaderItem(i).text() for i in range(self.param_table.columnCount())
-        ]
         for cell_data in Store.data:
             ws_data = wb.create_sheet(f"Data №{cell_data.cell} {cell_data.name}")
-            ws_data.append(data_headers)
-            for dat in cell_data.initial_data:
-                ws_data.cell(row=dat["row"] + 2, column=dat["col"] + 1, value=dat["value"])
+            ws_data.append(_DATA_HEADERS)
+            # Исходные данные записаны построчно по всем столбцам, поэтому пишем их целыми строками
+            for _, row_items in groupby(cell_data.initial_data, key=attrgetter("row")):
+                ws_data.append([dat.value for dat in row_items])
 
             ws_results = wb.create_sheet(f"Results №{cell_data.cell} {cell_data.name}")
-            ws_results.append(results_headers)
-            ws_results.cell(row=2, column=1, value=cell_data.slope)
-            ws_results.cell(row=2, column=2, value=cell_data.intercept)
-            ws_results.cell(row=2, column=3, value=cell_data.drift)
-            ws_results.cell(row=2, column=4, value=cell_data.rns)
-            ws_results.cell(row=2, column=5, value=cell_data.drift_error)
-            ws_results.cell(row=2, column=6, value=cell_data.rns_error)
+            ws_results.append(_RESULTS_HEADERS)
+            ws_results.append(
+                [
+                    cell_data.slope,
+                    cell_data.intercept,
+                    cell_data.drift,
+                    cell_data.rns,
+                    cell_data.drift_error,
+                    cell_data.rns_error,
+                ]
+            )
 
         # Save the Excel file
         if not file_name.endswith(".xlsx"):
@@ -442,11 +467,14 @@ class Window(QtWidgets.QWidget):
         wb.save(filename=file_name)
 
     def reload_tables_from_cell_data(self, cell: int):
-        cell_data = Store.data.get(cell=cell)
+        cell_data = Store.get_item(cell)
         if not cell_data:
             return
-        self.data_table.load_data(data=cell_data.initial_data)
-        self.param_table.load_data(data=cell_data)
+        self._last_calc_key = None
+        # Таблицы заполняются без сигналов и перерисовки на каждую ячейку
+        with self.data_table.bulk_update(), self.param_table.bulk_update():
+            self.data_table.load_data(data=cell_data.initial_data)
+            self.param_table.load_data(data=cell_data)
         self.plot_current_data()
 
     def clear_cell_data(self):
@@ -479,82 +507,93 @@ class Window(QtWidgets.QWidget):
             cell.clear()
         Store.clear()
 
-        options = QtWidgets.QFileDialog.Options()
         fileName, _ = QtWidgets.QFileDialog.getOpenFileName(
-            None, "Выберите файл XLSX", "", "Excel Files (*.xlsx);;All Files (*)", options=options
+            None, "Выберите файл XLSX", self._last_dir, "Excel Files (*.xlsx);;All Files (*)"
         )
 
         if not fileName:
             return
+        self._last_dir = os.path.dirname(fileName)
 
         is_some_errors = False
+        wb = None
         try:
-            wb = openpyxl.load_workbook(fileName)
+            # Режим только для чтения: строки читаются потоком, без разбора стилей и объектов ячеек
+            wb = openpyxl.load_workbook(fileName, read_only=True, data_only=True)
             data_sheet_names = [sh for sh in wb.sheetnames if sh.startswith("Data №")]
             if not len(data_sheet_names):
                 QtWidgets.QMessageBox.critical(
                     self, "Ошибка чтения", "Не найдены данные с нумерацией для записанных ячеек"
                 )
                 return
-            sheet_names = "\n".join(wb.sheetnames)
+            # Листы результатов индексируются по номеру ячейки один раз, первый найденный лист в приоритете
+            result_names = {}
+            for sheet_name in wb.sheetnames:
+                match = _RESULTS_SHEET_RE.match(sheet_name)
+                if match:
+                    result_names.setdefault(int(match.group(1)), sheet_name)
+
             for sheet_name in data_sheet_names:
-                try:
-                    i = int(re.findall(r"Data №(\d+) .*", sheet_name)[0])
-                    data_name = re.findall(f"(Data №{i} .*)", sheet_name)[0]
-                    result_name = re.findall(f"(Results №{i} .*)", sheet_names)[0]
-                    cell_name = re.findall(f"Data №{i} (.*)", sheet_name)[0]
-                except (IndexError, ValueError):
+                match = _DATA_SHEET_RE.match(sheet_name)
+                if not match or int(match.group(1)) not in result_names:
                     is_some_errors = True
                     continue
+                i = int(match.group(1))
+                cell_name = match.group(2)
+                result_name = result_names[i]
 
-                ws_data = wb[data_name]
+                ws_data = wb[sheet_name]
                 ws_result = wb[result_name]
 
+                # Строки дополняются до числа столбцов таблицы, пропущенные значения становятся пустыми
                 initial_data = InitialDataItemList()
-                for row in range(2, ws_data.max_row + 1):
-                    for col in range(0, ws_data.max_column):
-                        try:
-                            value = ws_data[row][col].value
-                            if not value:
-                                value = ""
-                            initial_data.append(InitialDataItem(row=row - 2, col=col, value=value))
-                        except IndexError:
-                            is_some_errors = True
-                            continue
-
-                diameter_list = [
-                    float(v.value) if v.value else None
-                    for v in initial_data.filter(col=DataTableColumns.DIAMETER.index)
-                ]
-                rn_sqrt_list = [
-                    float(v.value) if v.value else None
-                    for v in initial_data.filter(col=DataTableColumns.RN_SQRT.index)
-                ]
+                for row, values in enumerate(
+                    ws_data.iter_rows(min_row=2, max_col=len(DataTableColumns), values_only=True)
+                ):
+                    for col, value in enumerate(values):
+                        initial_data.append(InitialDataItem(row=row, col=col, value=value or ""))
+
+                results = next(
+                    ws_result.iter_rows(min_row=2, max_row=2, max_col=len(ParamTableColumns), values_only=True)
+                )
+
+                # Столбцы хранятся массивами float, пустые ячейки - NaN
+                diameter_arr = to_float_array(
+                    [v.value for v in initial_data.filter(col=DataTableColumns.DIAMETER.index)]
+                )
+                rn_sqrt_arr = to_float_array(
+                    [v.value for v in initial_data.filter(col=DataTableColumns.RN_SQRT.index)]
+                )
 
                 cell_item = Store.update_or_create_item(
                     cell=i,
                     name=cell_name,
-                    diameter_list=diameter_list,
-                    rn_sqrt_list=rn_sqrt_list,
-                    slope=ws_result[2][ParamTableColumns.SLOPE.index].value,
-                    intercept=ws_result[2][ParamTableColumns.INTERCEPT.index].value,
-                    drift=ws_result[2][ParamTableColumns.DRIFT.index].value,
-                    rns=ws_result[2][ParamTableColumns.RNS.index].value,
-                    drift_error=ws_result[2][ParamTableColumns.DRIFT_ERROR.index].value,
-                    rns_error=ws_result[2][ParamTableColumns.RNS_ERROR.index].value,
+                    diameter=diameter_arr,
+                    rn_sqrt=rn_sqrt_arr,
+                    slope=results[ParamTableColumns.SLOPE.index],
+                    intercept=results[ParamTableColumns.INTERCEPT.index],
+                    drift=results[ParamTableColumns.DRIFT.index],
+                    rns=results[ParamTableColumns.RNS.index],
+                    drift_error=results[ParamTableColumns.DRIFT_ERROR.index],
+                    rns_error=results[ParamTableColumns.RNS_ERROR.index],
                     initial_data=initial_data,
                 )
 
                 cell_widget = self.cell_widgets[cell_item.cell - 1]
                 cell_widget.name.setText(cell_item.name)
-                cell_widget.drift.setText(str(round(cell_item.drift, 3)))
-                cell_widget.rns.setText(str(round(cell_item.rns, 1)))
+                cell_widget.setValues(rns=cell_item.rns, drift=cell_item.drift)
                 cell_widget.updateUI()
-                self.calculate_means()
+
+            # Средние считаются один раз по всем загруженным ячейкам, а не после каждой
+            self.calculate_means()
 
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, "Ошибка чтения", f"Возникли ошибки чтения файла: {str(e)}")
             return
+        finally:
+            # Книга в режиме только для чтения держит файл открытым до явного закрытия
+            if wb is not None:
+                wb.close()
 
         if is_some_errors:
             QtWidgets.QMessageBox.warning(
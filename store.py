@@ -1,16 +1,24 @@
 from dataclasses import dataclass
-from typing import List, Any, Optional
+from operator import attrgetter
+from typing import Dict, Any, NamedTuple, Optional
+
+import numpy as np
 
 
 class BaseList(list):
-    def _filter(self, **kwargs) -> filter:
-        def _filter(item):
-            for key, value in kwargs.items():
-                if not getattr(item, key, None) == value:
-                    return False
-            return True
+    @staticmethod
+    def _getter(kwargs: dict):
+        """Один attrgetter на все ключи и ожидаемое значение (для нескольких ключей - кортеж значений)"""
+        if len(kwargs) == 1:
+            ((key, value),) = kwargs.items()
+            return attrgetter(key), value
+        return attrgetter(*kwargs), tuple(kwargs.values())
 
-        return filter(_filter, self)
+    def _filter(self, **kwargs) -> filter:
+        if not kwargs:
+            return filter(lambda item: True, self)
+        getter, values = self._getter(kwargs)
+        return filter(lambda item: getter(item) == values, self)
 
     def _exclude(self, **kwargs) -> filter:
         def _exclude(item):
@@ -28,66 +36,43 @@ class BaseList(list):
         return self.__class__(self._exclude(**kwargs))
 
     def get(self, **kwargs) -> Any:
-        try:
-            return self.filter(**kwargs)[0]
-        except IndexError:
-            return None
+        # Поиск останавливается на первом совпадении, без построения отфильтрованного списка
+        return next(self._filter(**kwargs), None)
 
     def exists(self):
         return len(self)
 
 
-@dataclass
-class InitialDataItem:
+class InitialDataItem(NamedTuple):
     value: str
     row: int
     col: int
 
-    @property
-    def dict(self):
-        return self.__dict__
-
-    def __getitem__(self, item):
-        return getattr(self, item)
-
 
 class InitialDataItemList(BaseList):
     ...
 
 
+@dataclass(slots=True, eq=False)
 class Item:
-    def __init__(
-        self,
-        cell: int,
-        name: str,
-        # Исходные данные
-        diameter_list: List[float],
-        rn_sqrt_list: List[float],
-        # Расчетные данные
-        slope: float,
-        intercept: float,
-        drift: float,
-        rns: float,
-        drift_error: float,
-        rns_error: float,
-        # Исходная таблица
-        initial_data: InitialDataItemList[InitialDataItem],
-    ):
-        self.cell = cell
-        self.name = name
-
-        self.diameter = diameter_list
-        self.rn_sqrt = rn_sqrt_list
-
-        self.slope = slope
-        self.intercept = intercept
-        self.drift = drift
-        self.rns = rns
-        self.drift_error = drift_error
-        self.rns_error = rns_error
-
-        self.initial_data = initial_data
-        self.is_plot = False
+    cell: int
+    name: str
+
+    # Исходные данные (пустые значения - NaN)
+    diameter: np.ndarray
+    rn_sqrt: np.ndarray
+
+    # Расчетные данные
+    slope: float
+    intercept: float
+    drift: float
+    rns: float
+    drift_error: float
+    rns_error: float
+
+    # Исходная таблица
+    initial_data: InitialDataItemList[InitialDataItem]
+    is_plot: bool = False
 
 
 class ItemsList(BaseList):
@@ -97,19 +82,38 @@ class ItemsList(BaseList):
 
 class Store:
     data: ItemsList[Item] = ItemsList()
+    # Индексы по номеру ячейки и имени, поддерживаются при записи и очистке
+    _by_cell: Dict[int, Item] = {}
+    _by_name: Dict[str, Item] = {}
+
+    @classmethod
+    def get_item(cls, cell: int) -> Optional[Item]:
+        return cls._by_cell.get(cell)
+
+    @classmethod
+    def is_name_taken(cls, name: str, cell: int) -> bool:
+        """Занято ли имя записью другой ячейки"""
+        item = cls._by_name.get(name)
+        return item is not None and item.cell != cell
 
     @classmethod
     def update_or_create_item(cls, cell: int, **kwargs) -> Item:
-        item = cls.data.get(cell=cell)
+        item = cls._by_cell.get(cell)
         if item:
+            if "name" in kwargs and cls._by_name.get(item.name) is item:
+                del cls._by_name[item.name]
             for k, v in kwargs.items():
                 setattr(item, k, v)
         else:
             item = Item(cell, **kwargs)
             cls.data.append(item)
+            cls._by_cell[cell] = item
+        cls._by_name[item.name] = item
 
         return item
 
     @classmethod
     def clear(cls):
         cls.data = ItemsList()
+        cls._by_cell = {}
+        cls._by_name = {}
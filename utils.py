@@ -1,37 +1,24 @@
-import numpy as np
-
-from errors import ListsNotSameLength
-
-
-def linear_fit(x, y):
-    """Расчет линейной аппроксимации"""
+import math
+from numbers import Real
+from statistics import fmean
 
-    def mean(xs):
-        return sum(xs) / len(xs)
-
-    m_x = mean(x)
-    m_y = mean(y)
-
-    def std(xs, m):
-        normalizer = len(xs) - 1
-        return np.sqrt(sum((pow(x1 - m, 2) for x1 in xs)) / normalizer)
+import numpy as np
 
-    def pearson_r(xs, ys):
-        sum_xy = 0
-        sum_sq_v_x = 0
-        sum_sq_v_y = 0
 
-        for x1, y2 in zip(xs, ys):
-            var_x = x1 - m_x
-            var_y = y2 - m_y
-            sum_xy += var_x * var_y
-            sum_sq_v_x += pow(var_x, 2)
-            sum_sq_v_y += pow(var_y, 2)
-        return sum_xy / np.sqrt(sum_sq_v_x * sum_sq_v_y)
+def format_value(value) -> str:
+    """Текст ячейки с полной точностью значения (int, float, np.float32/64), округление делает RoundedDelegate"""
+    return repr(float(value))
 
-    r = pearson_r(x, y)
 
-    slope = r * (std(y, m_y) / std(x, m_x))
+def linear_fit(x, y):
+    """Расчет линейной аппроксимации (метод наименьших квадратов в замкнутой форме)"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    m_x = x.mean()
+    m_y = y.mean()
+
+    dx = x - m_x
+    slope = (dx * (y - m_y)).sum() / (dx**2).sum()
     intercept = m_y - slope * m_x
 
     return slope, intercept
@@ -42,10 +29,25 @@ def linear(x: float, b: float, a: float):
     return x * b + a
 
 
-def drop_nans(arr1: list, arr2: list):
-    if len(arr1) != len(arr2):
-        raise ListsNotSameLength
-    return np.array([arr for arr in np.array([arr1, arr2]).T if all(arr)], dtype=float).T
+def to_float_array(values) -> np.ndarray:
+    """Приведение значений столбца к массиву float, пустые значения ("" или None) становятся NaN"""
+    if isinstance(values, np.ndarray) and values.dtype.kind == "f":
+        return values
+    return np.array([np.nan if value is None or value == "" else value for value in values], dtype=float)
+
+
+def extend_to_drift(diameter: np.ndarray, drift: float) -> np.ndarray:
+    """Дополнение отсортированных диаметров точкой ухода, чтобы прямая аппроксимации доходила до оси"""
+    if diameter[0] > drift:
+        return np.concatenate(([drift], diameter))
+    if diameter[-1] < drift:
+        return np.concatenate((diameter, [drift]))
+    return diameter
+
+
+def valid_samples(resistance: np.ndarray, diameter: np.ndarray) -> np.ndarray:
+    """Маска образцов с заполненными Rn и диаметром"""
+    return np.isfinite(resistance) & np.isfinite(diameter) & (resistance != 0) & (diameter != 0)
 
 
 # Расчетные функции
@@ -79,3 +81,18 @@ def calculate_rn_sqrt(resistance: float):
 def calculate_square(diameter: float, drift: float):
     """Расчет площади"""
     return (diameter - drift) ** 2 * np.pi / 4
+
+
+def finite_mean(values) -> float:
+    """Среднее заполненных числовых значений (None, NaN и не числа пропускаются), NaN если таких нет"""
+    values = [value for value in values if isinstance(value, Real) and math.isfinite(value)]
+    return fmean(values) if values else math.nan
+
+
+def calculate_rms_error(values: np.ndarray, center: float):
+    """Расчет среднеквадратичного отклонения значений образцов от общего значения (пустые значения - NaN)"""
+    values = values[np.isfinite(values)]
+    if not values.size:
+        return np.nan
+    # np.mean суммирует попарно - устойчивее наивной суммы квадратов на длинных столбцах
+    return np.sqrt(np.mean(np.square(values - center)))
@@ -7,8 +7,14 @@ from store import Store
 class CellWidget(QtWidgets.QGroupBox):
     def __init__(self, parent, index: int, param_table):
         super().__init__(parent)
+        # Главное окно запоминается сразу: после добавления в грид родителем станет группа ячеек
+        self.main_window = parent
         self.index = index
         self.param_table = param_table
+        # Контекстное меню и диалог перезаписи создаются при первом использовании
+        self._context_menu = None
+        self._rewrite_dialog = None
+        self._rewrite_label = None
         self.initUI()
 
     def initUI(self):
@@ -53,7 +59,7 @@ class CellWidget(QtWidgets.QGroupBox):
     def openWriteDialog(self):
         name, ok = QtWidgets.QInputDialog.getText(self, "Запись", "Введите уникальное имя:")
         if ok and name:
-            if Store.data.exclude(cell=self.index).filter(name=name).exists():
+            if Store.is_name_taken(name, cell=self.index):
                 QtWidgets.QMessageBox.warning(
                     self, "Ошибка", "Это имя уже существует. Пожалуйста, введите другое имя."
                 )
@@ -63,51 +69,72 @@ class CellWidget(QtWidgets.QGroupBox):
             self.updateUI()
 
     def writeData(self):
-        self.rns.setText(f"{round(self.param_table.get_column_value(0, ParamTableColumns.RNS), 1)}")
-        self.drift.setText(f"{round(self.param_table.get_column_value(0, ParamTableColumns.DRIFT), 3)}")
-        self.parent().parent().calculate_means()
-        self.parent().parent().addCellData(cell=self.index, name=self.name.text())
+        self.setValues(
+            rns=self.param_table.get_column_value(0, ParamTableColumns.RNS),
+            drift=self.param_table.get_column_value(0, ParamTableColumns.DRIFT),
+        )
+        self.main_window.addCellData(cell=self.index, name=self.name.text())
+        self.main_window.calculate_means()
+
+    def setValues(self, rns: float, drift: float):
+        # Текст метки меняется только при изменении, иначе лишняя перерисовка
+        for label, text in ((self.rns, f"{rns:.1f}"), (self.drift, f"{drift:.3f}")):
+            if label.text() != text:
+                label.setText(text)
 
     def updateUI(self):
         if self.rns.text() is not None and self.drift.text() is not None:
+            # Изменения видимости применяются одной перерисовкой
+            self.setUpdatesEnabled(False)
             self.writeButton.setVisible(False)
             self.rns.setVisible(True)
             self.drift.setVisible(True)
             self.checkbox.setVisible(True)
             self.setContextMenuPolicy(QtCore.Qt.ContextMenuPolicy.CustomContextMenu)
+            self.setUpdatesEnabled(True)
 
     def buildGraph(self, state):
-        cell_data = Store.data.get(cell=self.index)
+        cell_data = Store.get_item(self.index)
+        if cell_data is None:
+            return
         if state == QtCore.Qt.CheckState.Checked:
-            self.parent().parent().plot_data(self.index)
+            self.main_window.plot_data(self.index)
             cell_data.is_plot = True
         else:
-            self.parent().parent().remove_plot(self.index)
+            self.main_window.remove_plot(self.index)
             cell_data.is_plot = False
 
     def openRenameDialog(self):
         # Логика для открытия окна для переименования
         name, ok = QtWidgets.QInputDialog.getText(self, "Переименование", "Введите новое имя:")
         if name and ok:
-            if Store.data.exclude(cell=self.index).filter(name=name).exists():
+            if Store.is_name_taken(name, cell=self.index):
                 QtWidgets.QMessageBox.warning(
                     self, "Ошибка", "Это имя уже существует. Пожалуйста, введите другое имя."
                 )
                 return
             self.name.setText(name)
-            self.parent().parent().remove_plot(cell=self.index)
+            self.main_window.remove_plot(cell=self.index)
             cell_data = Store.update_or_create_item(cell=self.index, name=name)
             if cell_data.is_plot:
-                self.parent().parent().plot_data(cell=self.index)
+                self.main_window.plot_data(cell=self.index)
 
     def openRewriteDataDialog(self):
         # Логика для открытия окна для перезаписи
+        if self._rewrite_dialog is None:
+            self._rewrite_dialog = self._createRewriteDialog()
+        self._rewrite_label.setText(f"Вы уверены, что хотите перезаписать данные для ячейки {self.name.text()}?")
+
+        if self._rewrite_dialog.exec_() == QtWidgets.QDialog.Accepted:
+            self.writeData()
+
+    def _createRewriteDialog(self):
         dialog = QtWidgets.QDialog(self)
         dialog.setWindowTitle("Перезапись данных")
         dialog.setLayout(QtWidgets.QVBoxLayout())
 
-        label = QtWidgets.QLabel(f"Вы уверены, что хотите перезаписать данные для ячейки {self.name.text()}?")
-        dialog.layout().addWidget(label)
+        self._rewrite_label = QtWidgets.QLabel(dialog)
+        dialog.layout().addWidget(self._rewrite_label)
 
         buttonBox = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
         dialog.layout().addWidget(buttonBox)
@@ -118,9 +145,7 @@ class CellWidget(QtWidgets.QGroupBox):
 
         buttonBox.accepted.connect(dialog.accept)
         buttonBox.rejected.connect(dialog.reject)
-
-        if dialog.exec_() == QtWidgets.QDialog.Accepted:
-            self.writeData()
+        return dialog
 
     def showData(self):
         reply = QtWidgets.QMessageBox.question(
@@ -132,9 +157,16 @@ class CellWidget(QtWidgets.QGroupBox):
         )
 
         if reply == QtWidgets.QMessageBox.Yes:
-            self.parent().parent().reload_tables_from_cell_data(cell=self.index)
+            self.main_window.reload_tables_from_cell_data(cell=self.index)
 
     def showContextMenu(self, position):
+        if self._context_menu is None:
+            self._context_menu = self._createContextMenu()
+
+        # Показ контекстного меню в позиции курсора
+        self._context_menu.exec_(self.mapToGlobal(position))
+
+    def _createContextMenu(self):
         menu = QtWidgets.QMenu(self)
 
         showAction = QtWidgets.QAction("Показать данные", self)
@@ -148,17 +180,22 @@ class CellWidget(QtWidgets.QGroupBox):
         rewriteAction = QtWidgets.QAction("Перезаписать", self)
         rewriteAction.triggered.connect(self.openRewriteDataDialog)
         menu.addAction(rewriteAction)
-
-        # Показ контекстного меню в позиции курсора
-        menu.exec_(self.mapToGlobal(position))
+        return menu
 
     def clear(self):
+        self.setUpdatesEnabled(False)
+        # График ячейки убирается напрямую, снятие флажка не вызывает buildGraph: запись ячейки удаляется следом
+        if self.checkbox.isChecked():
+            self.main_window.remove_plot(self.index)
+        self.checkbox.blockSignals(True)
+        self.checkbox.setChecked(False)
+        self.checkbox.blockSignals(False)
         self.name.setText("")
         self.rns.setText("")
         self.drift.setText("")
         self.rns.setVisible(False)
         self.drift.setVisible(False)
-        self.checkbox.setChecked(False)
         self.checkbox.setVisible(False)
         self.writeButton.setVisible(True)
         self.setContextMenuPolicy(QtCore.Qt.ContextMenuPolicy.NoContextMenu)
+        self.setUpdatesEnabled(True)
@@ -1,5 +1,6 @@
-from typing import List
+from typing import Dict, List
 
+import numpy as np
 from PyQt5 import QtWidgets, QtCore, QtGui
 from PyQt5.QtWidgets import QHeaderView
 
@@ -11,6 +12,25 @@ from widgets.tables.mixins import TableMixin
 
 
 class DataTable(TableMixin, QtWidgets.QTableWidget):
+    # Индексы столбцов для проверок принадлежности считаются один раз
+    CALCULATED_COLUMNS = frozenset(
+        (
+            DataTableColumns.RNS.index,
+            DataTableColumns.RN_SQRT.index,
+            DataTableColumns.DRIFT.index,
+            DataTableColumns.SQUARE.index,
+        )
+    )
+    PASTE_COLUMNS = frozenset(
+        (
+            DataTableColumns.DIAMETER.index,
+            DataTableColumns.RESISTANCE.index,
+            DataTableColumns.NUMBER.index,
+            DataTableColumns.NAME.index,
+        )
+    )
+    FLOAT_PASTE_COLUMNS = frozenset((DataTableColumns.DIAMETER.index, DataTableColumns.RESISTANCE.index))
+
     def __init__(self, rows):
         super(DataTable, self).__init__(rows, len(DataTableColumns.get_all_names()))
 
@@ -37,14 +57,7 @@ class DataTable(TableMixin, QtWidgets.QTableWidget):
         self.set_default_numbers()
 
         # Set columns RnS, Rn, Drift, Square as read-only
-        self.set_read_only_columns(
-            [
-                DataTableColumns.RNS.index,
-                DataTableColumns.RN_SQRT.index,
-                DataTableColumns.DRIFT.index,
-                DataTableColumns.SQUARE.index,
-            ]
-        )
+        self.set_read_only_columns(sorted(self.CALCULATED_COLUMNS))
 
         self.setItemDelegateForColumn(DataTableColumns.DRIFT.index, RoundedDelegate(rounded=3, parent=self))
         self.setItemDelegateForColumn(DataTableColumns.RNS.index, RoundedDelegate(rounded=1, parent=self))
@@ -72,12 +85,7 @@ class DataTable(TableMixin, QtWidgets.QTableWidget):
             selected_items = self.selectedItems()
             if selected_items:
                 for item in selected_items:
-                    if item.column() not in [
-                        DataTableColumns.RNS.index,
-                        DataTableColumns.RN_SQRT.index,
-                        DataTableColumns.DRIFT.index,
-                        DataTableColumns.SQUARE.index,
-                    ]:  # Нельзя изменить Rn, RnS, Drift
+                    if item.column() not in self.CALCULATED_COLUMNS:  # Нельзя изменить Rn, RnS, Drift
                         self.setItem(item.row(), item.column(), TableWidgetItem(""))
 
         # Ивент вставки ctrl-v
@@ -109,21 +117,13 @@ class DataTable(TableMixin, QtWidgets.QTableWidget):
         rows = data.split("\n")
         start_row = self.currentRow()
         start_col = self.currentColumn()
-        if start_col not in [
-            DataTableColumns.DIAMETER.index,
-            DataTableColumns.RESISTANCE.index,
-            DataTableColumns.NUMBER.index,
-            DataTableColumns.NAME.index,
-        ]:  # Можно вставлять только в Number, Name, Diameter, Resistance
+        if start_col not in self.PASTE_COLUMNS:  # Можно вставлять только в Number, Name, Diameter, Resistance
 
             return
         for i, row in enumerate(rows):
             values = row.split("\t")
             for j, value in enumerate(values):
-                if start_col in [
-                    DataTableColumns.DIAMETER.index,
-                    DataTableColumns.RESISTANCE.index,
-                ]:  # Для данных колонок нужны числа float
+                if start_col in self.FLOAT_PASTE_COLUMNS:  # Для данных колонок нужны числа float
                     value = value.replace(",", ".")
                 item = TableWidgetItem(value)
                 self.setItem(start_row + i, start_col + j, item)
@@ -134,6 +134,25 @@ class DataTable(TableMixin, QtWidgets.QTableWidget):
     def get_column_value(self, row: int, column: DataTableColumns):
         return super().get_column_value(row, column)
 
+    def snapshot_numeric(self) -> Dict[int, np.ndarray]:
+        """Снимок всех числовых столбцов (по проходу на столбец), пустые ячейки заменяются на NaN"""
+        # Расчетные столбцы тоже читаются: по полному снимку строится ключ пропуска повторного расчета
+        item_fn = self.item
+        rows = range(self.rowCount())
+        snapshot = {}
+        for column in DataTableColumns:
+            if column.dtype is not float:
+                continue
+            index = column.index
+            values = np.full(self.rowCount(), np.nan)
+            for row in rows:
+                try:
+                    values[row] = float(item_fn(row, index).text())
+                except (ValueError, AttributeError):
+                    continue
+            snapshot[column.index] = values
+        return snapshot
+
     def clear_all(self):
         for row in range(self.rowCount()):
             self.setItem(
@@ -197,37 +216,16 @@ class DataTable(TableMixin, QtWidgets.QTableWidget):
             )  # Clear Rn^-0.5 column
             self.setItem(row, DataTableColumns.SQUARE.index, QtWidgets.QTableWidgetItem(""))  # Clear Square
 
-    def clear_calculations(self):
-        for row in range(self.rowCount()):
-            self.setItem(
-                row,
-                DataTableColumns.RNS.index,
-                QtWidgets.QTableWidgetItem(""),
-            )  # Clear RnS column
-            self.setItem(
-                row,
-                DataTableColumns.DRIFT.index,
-                QtWidgets.QTableWidgetItem(""),
-            )  # Clear Drift column
-            self.setItem(
-                row,
-                DataTableColumns.RN_SQRT.index,
-                QtWidgets.QTableWidgetItem(""),
-            )  # Clear Rn^-0.5 column
-            self.setItem(row, DataTableColumns.SQUARE.index, QtWidgets.QTableWidgetItem(""))  # Clear Square
-
     def dump_data(self):
+        item_fn = self.item
+        columns = range(self.columnCount())
         data = []
         for row in range(self.rowCount()):
-            for col in range(self.columnCount()):
-                item = self.item(row, col)
-                if not item:
-                    item = ""
-                else:
-                    item = item.text()
-                data.append(InitialDataItem(value=item, row=row, col=col))
+            for col in columns:
+                item = item_fn(row, col)
+                data.append(InitialDataItem(value=item.text() if item is not None else "", row=row, col=col))
         return data
 
     def load_data(self, data: List[InitialDataItem]):
         for item in data:
-            self.setItem(item["row"], item["col"], TableWidgetItem(f"{item['value']}"))
+            self.set_if_changed(item.row, item.col, f"{item.value}")
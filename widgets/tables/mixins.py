@@ -1,5 +1,10 @@
+import math
+from contextlib import contextmanager
+
 from constants import TableColumns
+from utils import format_value
 from widgets.delegates import ReadOnlyDelegate
+from widgets.tables.item import TableWidgetItem
 
 
 class TableMixin:
@@ -10,11 +15,14 @@ class TableMixin:
             return None
 
     def get_column_values(self, column: TableColumns):
+        item_fn = self.item
+        index = column.index
+        dtype = column.dtype
         values = []
         for row in range(self.rowCount()):
-            value = self.item(row, column.index)
+            value = item_fn(row, index)
             try:
-                values.append(column.dtype(value.text()))
+                values.append(dtype(value.text()))
             except (ValueError, AttributeError):
                 values.append("")
         return values
@@ -22,3 +30,34 @@ class TableMixin:
     def set_read_only_columns(self, columns):
         for col in columns:
             self.setItemDelegateForColumn(col, ReadOnlyDelegate(self))
+
+    @contextmanager
+    def bulk_update(self):
+        """Пакетная запись ячеек: без сигналов виджета и перерисовки на каждый setItem"""
+        signals_blocked = self.blockSignals(True)
+        updates_enabled = self.updatesEnabled()
+        self.setUpdatesEnabled(False)
+        try:
+            yield self
+        finally:
+            # Вложенный вызов возвращает состояние внешнего, перерисовка - только на выходе из внешнего
+            self.setUpdatesEnabled(updates_enabled)
+            self.blockSignals(signals_blocked)
+            if updates_enabled:
+                self.viewport().update()
+
+    def set_if_changed(self, row: int, col: int, text: str):
+        # Текст меняется только при его изменении, иначе лишние сигналы модели и перерисовка.
+        # Свой элемент переиспользуется, пустая ячейка или обычный QTableWidgetItem (без выравнивания) заменяются
+        item = self.item(row, col)
+        if isinstance(item, TableWidgetItem):
+            if item.text() != text:
+                item.setText(text)
+        else:
+            self.setItem(row, col, TableWidgetItem(text))
+
+    def set_column_if_changed(self, column: TableColumns, values):
+        """Запись столбца значений, NaN записывается пустой ячейкой"""
+        with self.bulk_update():
+            for row, value in enumerate(values.tolist()):
+                self.set_if_changed(row, column.index, "" if math.isnan(value) else format_value(value))
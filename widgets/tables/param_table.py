@@ -3,7 +3,6 @@ from PyQt5 import QtWidgets
 from constants import ParamTableColumns
 from store import Item
 from widgets.delegates import RoundedDelegate
-from widgets.tables.item import TableWidgetItem
 from widgets.tables.mixins import TableMixin
 
 
@@ -40,6 +39,17 @@ class ParamTable(TableMixin, QtWidgets.QTableWidget):
     def get_column_value(self, row: int, column: ParamTableColumns):
         return super().get_column_value(row, column)
 
+    def get_row(self, row: int) -> dict:
+        """Значения всех столбцов строки по столбцам ParamTableColumns (пустые - None)"""
+        item_fn = self.item
+        values = {}
+        for column in ParamTableColumns:
+            try:
+                values[column] = column.dtype(item_fn(row, column.index).text())
+            except (ValueError, AttributeError):
+                values[column] = None
+        return values
+
     def clear_all(self):
         for col in range(self.columnCount()):
             self.setItem(
@@ -49,9 +59,11 @@ class ParamTable(TableMixin, QtWidgets.QTableWidget):
             )
 
     def load_data(self, data: Item):
-        self.setItem(0, ParamTableColumns.SLOPE.index, TableWidgetItem(str(data.slope)))
-        self.setItem(0, ParamTableColumns.INTERCEPT.index, TableWidgetItem(str(data.intercept)))
-        self.setItem(0, ParamTableColumns.DRIFT.index, TableWidgetItem(str(data.drift)))
-        self.setItem(0, ParamTableColumns.RNS.index, TableWidgetItem(str(data.rns)))
-        self.setItem(0, ParamTableColumns.DRIFT_ERROR.index, TableWidgetItem(str(data.drift_error)))
-        self.setItem(0, ParamTableColumns.RNS_ERROR.index, TableWidgetItem(str(data.rns_error)))
+        # Здесь str, а не format_value: значения из файла бывают пустыми (None) или текстом и показываются как есть.
+        # Для float текст str совпадает с format_value
+        self.set_if_changed(0, ParamTableColumns.SLOPE.index, str(data.slope))
+        self.set_if_changed(0, ParamTableColumns.INTERCEPT.index, str(data.intercept))
+        self.set_if_changed(0, ParamTableColumns.DRIFT.index, str(data.drift))
+        self.set_if_changed(0, ParamTableColumns.RNS.index, str(data.rns))
+        self.set_if_changed(0, ParamTableColumns.DRIFT_ERROR.index, str(data.drift_error))
+        self.set_if_changed(0, ParamTableColumns.RNS_ERROR.index, str(data.rns_error))